@@ -10,7 +10,7 @@ from langchain_huggingface import HuggingFaceEndpoint, ChatHuggingFace
 from agents.sql_agent import AgentState
 
 # === Local tools ===
-from tools.db_tools import create_temp_mysql_db_from_dump, drop_temp_mysql_db
+from tools.state_store import load_dataset
 from tools.query_generator import generate_sql_chain
 from tools.data_reasoner import reason_chain
 
@@ -35,7 +35,8 @@ def node_create_db(state: AgentState) -> AgentState:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Uploaded SQL file not found: {file_path}")
 
-    db_config = create_temp_mysql_db_from_dump(file_path)
+    # reuse the shared registry entry; only one worker ever imports a dump
+    db_config = state.get("db_config") or load_dataset(file_path)["db_config"]
     new_state = dict(state)
     new_state["db_config"] = db_config
     return new_state
@@ -118,11 +119,6 @@ def node_reason(state: AgentState) -> AgentState:
         "result": state["result"]
     })
 
-    try:
-        drop_temp_mysql_db(state["db_config"]["database"])
-    except Exception as e:
-        print(f"Warning: could not drop temp DB - {e}")
-
     new_state = dict(state)
     new_state["answer"] = answer
     return new_state
@@ -5,7 +5,7 @@ import mysql.connector
 from flask import current_app
 from langgraph.graph import StateGraph
 from agents.sql_agent import AgentState
-from tools.db_tools import create_temp_mysql_db_from_dump, drop_temp_mysql_db
+from tools.state_store import load_dataset
 from tools.query_generator import generate_sql_chain
 from tools.data_reasoner import reason_chain
 
@@ -26,7 +26,8 @@ def node_create_db(state: AgentState) -> AgentState:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Uploaded SQL file not found: {file_path}")
 
-    db_config = create_temp_mysql_db_from_dump(file_path)
+    # reuse the shared registry entry; only one worker ever imports a dump
+    db_config = state.get("db_config") or load_dataset(file_path)["db_config"]
     return update_state(state, db_config=db_config)
 
 
@@ -88,12 +89,6 @@ def node_reason(state: AgentState) -> AgentState:
         "result": state["result"]
     })
 
-    # optional cleanup: drop temp MySQL DB
-    try:
-        drop_temp_mysql_db(state["db_config"]["database"])
-    except Exception as e:
-        print(f"Warning: failed to drop temp DB - {e}")
-
     return update_state(state, answer=answer)
 
 
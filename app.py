@@ -1,11 +1,15 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash
+from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, Response
 import os
 from werkzeug.utils import secure_filename
-import mysql.connector
 from agents.sql_agent import AgentState
 # from agents.langgraph_app import ai_app
 from agents.agentic_workflow import ai_app
-from tools.db_tools import create_temp_mysql_db_from_dump, drop_temp_mysql_db
+from tools.db_tools import mysql_db_name
+from tools.state_store import (
+    get_dataset, load_dataset, unload_dataset, list_datasets, warm_datasets,
+    dataset_for_database
+)
+from tools.result_store import PAGE_SIZE, save_result, read_page, page_to_arrow
 
 app = Flask(__name__)
 
@@ -14,8 +18,8 @@ ALLOWED_EXTENSIONS = {"sql"}
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-schemas = {}
-db_cache = {}
+# dataset/schema state lives in tools.state_store so every worker shares it;
+# it is pre-warmed by the gunicorn master (gunicorn.conf.py) or in __main__
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -38,31 +42,16 @@ def upload_file():
 
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
+        owner = dataset_for_database(mysql_db_name(filename))
+        if owner and owner != filename:
+            flash(f"'{filename}' clashes with existing dataset '{owner}'. Rename the file and try again.", "error")
+            return redirect(url_for("index"))
+
         file_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
         file.save(file_path)
 
         try:
-            db_config = create_temp_mysql_db_from_dump(file_path)
-            db_cache[filename] = db_config
-            schema_info = {}
-
-            conn = mysql.connector.connect(**db_config)
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE
-                FROM INFORMATION_SCHEMA.COLUMNS
-                WHERE TABLE_SCHEMA = %s
-            """, (db_config["database"],))
-            rows = cursor.fetchall()
-            for table, column, col_type in rows:
-                schema_info.setdefault(table, []).append(f"{column} ({col_type})")
-            conn.close()
-
-            schemas[filename] = {
-                "filename": filename,
-                "schema": schema_info,
-                "db_config": db_config
-            }
+            load_dataset(file_path, reload=True)
 
             flash(f"File '{filename}' uploaded and schema loaded successfully.", "success")
         except Exception as e:
@@ -84,29 +73,7 @@ def load_schema():
     if not os.path.exists(file_path):
         return jsonify({"error": f"File '{filename}' not found."}), 404
 
-    db_config = db_cache.get(filename)
-    if not db_config:
-        db_config = create_temp_mysql_db_from_dump(file_path)
-        db_cache[filename] = db_config
-
-    schema_info = {}
-    conn = mysql.connector.connect(**db_config)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE
-        FROM INFORMATION_SCHEMA.COLUMNS
-        WHERE TABLE_SCHEMA = %s
-    """, (db_config["database"],))
-    rows = cursor.fetchall()
-    for table, column, col_type in rows:
-        schema_info.setdefault(table, []).append(f"{column} ({col_type})")
-    conn.close()
-
-    schemas[filename] = {
-        "filename": filename,
-        "schema": schema_info,
-        "db_config": db_config
-    }
+    schema_info = load_dataset(file_path)["schema"]
 
     return jsonify({"message": f"Loaded schema for {filename}", "schema": schema_info})
 
@@ -121,36 +88,12 @@ def chat():
     if not filename:
         return jsonify({"error": "Missing filename"}), 400
 
-    schema_entry = schemas.get(filename)
+    schema_entry = get_dataset(filename)
     if not schema_entry:
         file_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
         if not os.path.exists(file_path):
             return jsonify({"error": f"File '{filename}' not found."}), 404
-
-        db_config = db_cache.get(filename)
-        if not db_config:
-            db_config = create_temp_mysql_db_from_dump(file_path)
-            db_cache[filename] = db_config
-
-        schema_info = {}
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE
-            FROM INFORMATION_SCHEMA.COLUMNS
-            WHERE TABLE_SCHEMA = %s
-        """, (db_config["database"],))
-        rows = cursor.fetchall()
-        for table, column, col_type in rows:
-            schema_info.setdefault(table, []).append(f"{column} ({col_type})")
-        conn.close()
-
-        schemas[filename] = {
-            "filename": filename,
-            "schema": schema_info,
-            "db_config": db_config
-        }
-        schema_entry = schemas[filename]
+        schema_entry = load_dataset(file_path)
 
     initial_state = AgentState(
         user_query=query,
@@ -159,21 +102,51 @@ def chat():
     )
     result_state = ai_app.invoke(initial_state)
 
+    # only the first page goes out inline; the rest is fetched via /results
+    rows = result_state.get("result")
+    result = read_page(save_result(rows)) if rows else None
+
     return jsonify({
         "dataset": filename,
         "sql": result_state.get("generated_sql"),
-        "result": result_state.get("result"),
+        "result": result,
         "answer": result_state.get("answer")
     })
 
+@app.route("/results/<result_id>", methods=["GET"])
+def get_results(result_id):
+    cursor = request.args.get("cursor", 0, type=int)
+    limit = request.args.get("limit", PAGE_SIZE, type=int)
+    fmt = request.args.get("format", "json")
+    if fmt not in ("json", "arrow"):
+        return jsonify({"error": "format must be 'json' or 'arrow'"}), 400
+
+    page = read_page(result_id, cursor, limit)
+    if page is None:
+        return jsonify({"error": f"Result '{result_id}' not found or expired."}), 404
+
+    if fmt == "arrow":
+        try:
+            body = page_to_arrow(page)
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 406
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 500
+        headers = {
+            "X-Row-Count": str(page["row_count"]),
+            "X-Next-Cursor": "" if page["next_cursor"] is None else str(page["next_cursor"]),
+        }
+        return Response(body, mimetype="application/vnd.apache.arrow.stream", headers=headers)
+
+    return jsonify(page)
+
 @app.route("/cleanup_db", methods=["POST"])
 def cleanup_db():
-    for filename, cfg in list(db_cache.items()):
+    for filename in list_datasets():
         try:
-            drop_temp_mysql_db(cfg)
+            unload_dataset(filename)
         except Exception as e:
             print(f"Failed to drop {filename}: {e}")
-    db_cache.clear()
     return jsonify({"message": "All temporary databases dropped."})
 
 @app.route("/delete_dataset", methods=["POST"])
@@ -187,16 +160,13 @@ def delete_dataset():
     if os.path.exists(file_path):
         os.remove(file_path)
 
-    db_cfg = db_cache.get(filename)
-    if db_cfg:
-        try:
-            drop_temp_mysql_db(db_cfg)
-            del db_cache[filename]
-        except Exception as e:
-            print(f"Error dropping DB for {filename}: {e}")
+    try:
+        unload_dataset(filename)
+    except Exception as e:
+        print(f"Error dropping DB for {filename}: {e}")
 
-    schemas.pop(filename, None)
     return jsonify({"message": f"{filename} and its temporary database deleted successfully."})
 
 if __name__ == "__main__":
+    warm_datasets(UPLOAD_FOLDER)
     app.run(debug=True)
@@ -0,0 +1,11 @@
+# gunicorn.conf.py
+# Loaded automatically by `gunicorn app:app` from the project root.
+from tools.state_store import warm_datasets
+
+UPLOAD_FOLDER = "uploads"  # same as app.UPLOAD_FOLDER
+
+
+def on_starting(server):
+    # import every uploaded dump once, in the master, before any worker boots,
+    # so no worker blocks on an import past its heartbeat timeout
+    warm_datasets(UPLOAD_FOLDER)
@@ -13,6 +13,16 @@ MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
 MYSQL_PORT = os.getenv("MYSQL_PORT")
 
 
+def mysql_db_name(dump_file_path: str) -> str:
+    """
+    Returns the MySQL database name used for an uploaded .sql file.
+    Different filenames can map to the same name (a-b.sql, a_b.sql).
+    """
+    base_name = os.path.basename(dump_file_path)
+    db_name = os.path.splitext(base_name)[0]
+    return re.sub(r"[^0-9a-zA-Z_]", "_", db_name)
+
+
 def create_temp_mysql_db_from_dump(dump_file_path: str) -> dict:
     """
     Creates or reuses a MySQL database named after the uploaded .sql file.
@@ -20,8 +30,7 @@ def create_temp_mysql_db_from_dump(dump_file_path: str) -> dict:
     Returns connection info.
     """
     base_name = os.path.basename(dump_file_path)
-    db_name = os.path.splitext(base_name)[0]
-    db_name = re.sub(r"[^0-9a-zA-Z_]", "_", db_name)  
+    db_name = mysql_db_name(dump_file_path)
 
     # connecting to MySQL
     conn = mysql.connector.connect(
@@ -29,8 +38,11 @@ def create_temp_mysql_db_from_dump(dump_file_path: str) -> dict:
     )
     cursor = conn.cursor()
 
-    # checking if DB already exists
-    cursor.execute("SHOW DATABASES LIKE %s", (db_name,))
+    # checking if DB already exists (exact match; LIKE treats "_" as a wildcard)
+    cursor.execute(
+        "SELECT SCHEMA_NAME FROM INFORMATION_SCHEMA.SCHEMATA WHERE SCHEMA_NAME = %s",
+        (db_name,),
+    )
     db_exists = cursor.fetchone()
 
     if not db_exists:
@@ -63,12 +75,23 @@ def create_temp_mysql_db_from_dump(dump_file_path: str) -> dict:
         db_name,
     ]
 
-    subprocess.run(
-        cmd, stdin=open(temp_path, "r", encoding="utf-8", errors="ignore"),
-        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-    )
+    with open(temp_path, "r", encoding="utf-8", errors="ignore") as dump_f:
+        proc = subprocess.run(
+            cmd, stdin=dump_f,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
     os.remove(temp_path)
 
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import of {base_name} failed: {proc.stderr.strip()}")
+
+    return mysql_db_config(db_name)
+
+
+def mysql_db_config(db_name: str) -> dict:
+    """
+    Returns connection info for db_name using the current MySQL settings.
+    """
     return {
         "host": MYSQL_HOST,
         "user": MYSQL_USER,
@@ -78,6 +101,21 @@ def create_temp_mysql_db_from_dump(dump_file_path: str) -> dict:
     }
 
 
+def mysql_db_exists(db_name: str) -> bool:
+    conn = mysql.connector.connect(
+        host=MYSQL_HOST, user=MYSQL_USER, password=MYSQL_PASSWORD, port=MYSQL_PORT
+    )
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT SCHEMA_NAME FROM INFORMATION_SCHEMA.SCHEMATA WHERE SCHEMA_NAME = %s",
+        (db_name,),
+    )
+    exists = cursor.fetchone() is not None
+    cursor.close()
+    conn.close()
+    return exists
+
+
 def drop_temp_mysql_db(mysql_config: dict):
     """
     Drops the MySQL database created for an uploaded .sql file.
@@ -98,3 +136,24 @@ def drop_temp_mysql_db(mysql_config: dict):
     conn.commit()
     cursor.close()
     conn.close()
+
+
+def fetch_mysql_schema(mysql_config: dict) -> dict:
+    """
+    Reads table and column definitions for the given database.
+    Returns {table: ["column (type)", ...]}.
+    """
+    schema_info = {}
+    conn = mysql.connector.connect(**mysql_config)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = %s
+    """, (mysql_config["database"],))
+    rows = cursor.fetchall()
+    for table, column, col_type in rows:
+        schema_info.setdefault(table, []).append(f"{column} ({col_type})")
+    cursor.close()
+    conn.close()
+    return schema_info
@@ -0,0 +1,259 @@
+# tools/result_store.py
+# Query results kept server-side in columnar chunks so /chat only ships the
+# first page and the UI pulls the rest by cursor from /results/<id>.
+# Stored next to the dataset registry, so any worker can serve any page.
+import os
+import json
+import time
+import uuid
+import sqlite3
+import datetime
+from decimal import Decimal
+
+from tools.state_store import STATE_DIR
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow output is optional
+    pa = None
+
+RESULTS_DB = os.path.join(STATE_DIR, "results.sqlite3")
+PAGE_SIZE = 200        # default rows per page
+MAX_PAGE_SIZE = 5000
+CHUNK_ROWS = 1000      # rows per stored chunk
+RESULT_TTL = 3600      # seconds a result stays fetchable
+
+
+def _connect():
+    os.makedirs(STATE_DIR, exist_ok=True)
+    conn = sqlite3.connect(RESULTS_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS results (
+            result_id  TEXT PRIMARY KEY,
+            columns    TEXT NOT NULL,
+            types      TEXT NOT NULL,
+            row_count  INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS result_chunks (
+            result_id TEXT NOT NULL,
+            chunk_no  INTEGER NOT NULL,
+            data      TEXT NOT NULL,
+            PRIMARY KEY (result_id, chunk_no)
+        )
+    """)
+    return conn
+
+
+def _column_type(values) -> str:
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, bool):
+            return "bool"
+        if isinstance(v, int):
+            return "int"
+        if isinstance(v, Decimal):
+            return "decimal"
+        if isinstance(v, float):
+            return "float"
+        if isinstance(v, datetime.datetime):
+            return "datetime"
+        if isinstance(v, datetime.date):
+            return "date"
+        return "str"
+    return "null"
+
+
+def _int_type(values) -> str:
+    """
+    "int" (int64) unless a value needs more room: BIGINT UNSIGNED becomes
+    "uint64", anything larger an exact "decimal(p,0)".
+    """
+    ints = [v for v in values if isinstance(v, int)]
+    low, high = min(ints), max(ints)
+    if low >= -2**63 and high < 2**63:
+        return "int"
+    if low >= 0 and high < 2**64:
+        return "uint64"
+    return f"decimal({max(len(str(abs(low))), len(str(high)))},0)"
+
+
+def _decimal_type(values) -> str:
+    """
+    One "decimal(precision,scale)" for the whole column, so every page of a
+    result is encoded with the same Arrow type.
+    """
+    int_digits, scale = 1, 0
+    for v in values:
+        if v is None or not v.is_finite():
+            continue
+        _, digits, exponent = v.as_tuple()
+        scale = max(scale, -exponent)
+        int_digits = max(int_digits, len(digits) + exponent)
+    return f"decimal({int_digits + scale},{scale})"
+
+
+def _cell(value, col_type: str):
+    if value is None:
+        return None
+    if col_type == "float":
+        return float(value)
+    if col_type.startswith("decimal"):
+        return str(value)  # exact; float() would lose precision
+    if col_type in ("date", "datetime"):
+        return value.isoformat()
+    if col_type == "str":
+        if isinstance(value, (bytes, bytearray)):
+            return value.decode("utf-8", errors="replace")
+        if not isinstance(value, str):
+            return str(value)
+    return value
+
+
+def to_columnar(rows: list) -> dict:
+    """
+    Converts a list of row dicts into
+    {"columns": [...], "types": [...], "data": [[col0 values], [col1 values], ...]}.
+    """
+    columns = list(rows[0].keys()) if rows else []
+    data, types = [], []
+    for col in columns:
+        values = [row.get(col) for row in rows]
+        col_type = _column_type(values)
+        if col_type == "decimal":
+            col_type = _decimal_type(values)
+        elif col_type == "int":
+            col_type = _int_type(values)
+        types.append(col_type)
+        data.append([_cell(v, col_type) for v in values])
+    return {"columns": columns, "types": types, "data": data}
+
+
+def save_result(rows: list) -> str:
+    """
+    Stores a query result and returns its id for later page fetches.
+    """
+    result = to_columnar(rows or [])
+    result_id = uuid.uuid4().hex
+    row_count = len(rows or [])
+
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                "DELETE FROM result_chunks WHERE result_id IN "
+                "(SELECT result_id FROM results WHERE created_at < ?)",
+                (time.time() - RESULT_TTL,),
+            )
+            conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - RESULT_TTL,))
+            conn.execute(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?)",
+                (result_id, json.dumps(result["columns"]), json.dumps(result["types"]),
+                 row_count, time.time()),
+            )
+            conn.executemany(
+                "INSERT INTO result_chunks VALUES (?, ?, ?)",
+                [
+                    (result_id, start // CHUNK_ROWS,
+                     json.dumps([col[start:start + CHUNK_ROWS] for col in result["data"]]))
+                    for start in range(0, row_count, CHUNK_ROWS)
+                ],
+            )
+    finally:
+        conn.close()
+    return result_id
+
+
+def read_page(result_id: str, cursor: int = 0, limit: int = PAGE_SIZE):
+    """
+    Returns one columnar page starting at row `cursor`, or None if the
+    result is unknown or expired. next_cursor is None on the last page.
+    """
+    cursor = max(cursor, 0)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    conn = _connect()
+    try:
+        meta = conn.execute(
+            "SELECT columns, types, row_count, created_at FROM results WHERE result_id = ?",
+            (result_id,),
+        ).fetchone()
+        if not meta or meta[3] < time.time() - RESULT_TTL:
+            return None
+        columns, types, row_count = json.loads(meta[0]), json.loads(meta[1]), meta[2]
+
+        end = min(cursor + limit, row_count)
+        data = [[] for _ in columns]
+        if cursor < end:
+            chunks = conn.execute(
+                "SELECT chunk_no, data FROM result_chunks "
+                "WHERE result_id = ? AND chunk_no BETWEEN ? AND ? ORDER BY chunk_no",
+                (result_id, cursor // CHUNK_ROWS, (end - 1) // CHUNK_ROWS),
+            ).fetchall()
+            for chunk_no, chunk in chunks:
+                base = chunk_no * CHUNK_ROWS
+                lo, hi = max(cursor, base) - base, min(end, base + CHUNK_ROWS) - base
+                for i, col in enumerate(json.loads(chunk)):
+                    data[i].extend(col[lo:hi])
+    finally:
+        conn.close()
+
+    return {
+        "id": result_id,
+        "columns": columns,
+        "types": types,
+        "data": data,
+        "row_count": row_count,
+        "cursor": cursor,
+        "limit": limit,
+        "next_cursor": end if end < row_count else None,
+    }
+
+
+def page_to_arrow(page: dict) -> bytes:
+    """
+    Encodes a page as an Arrow IPC stream. Requires pyarrow.
+    Raises ValueError if a column cannot be encoded.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+    arrow_types = {
+        "int": pa.int64(), "uint64": pa.uint64(), "float": pa.float64(), "bool": pa.bool_(),
+        "date": pa.date32(), "datetime": pa.timestamp("us"), "str": pa.string(),
+        "null": pa.null(),
+    }
+    # pages hold ISO strings for dates; Arrow gets the typed values back
+    parse = {
+        "date": datetime.date.fromisoformat,
+        "datetime": datetime.datetime.fromisoformat,
+    }
+
+    def to_array(col_type, values):
+        if col_type in parse:
+            values = [None if v is None else parse[col_type](v) for v in values]
+        if col_type.startswith("decimal"):
+            precision, scale = map(int, col_type[len("decimal("):-1].split(","))
+            if precision > 76:
+                return pa.array(values, type=pa.string())
+            decimal_type = pa.decimal128 if precision <= 38 else pa.decimal256
+            return pa.array(
+                [None if v is None else Decimal(v) for v in values],
+                type=decimal_type(precision, scale),
+            )
+        return pa.array(values, type=arrow_types[col_type])
+
+    try:
+        table = pa.table({
+            name: to_array(col_type, values)
+            for name, col_type, values in zip(page["columns"], page["types"], page["data"])
+        })
+    except (pa.ArrowException, OverflowError) as e:
+        raise ValueError(f"Cannot encode result as Arrow: {e}")
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,213 @@
+# tools/state_store.py
+# Dataset registry shared by every worker process. Database names and schemas
+# live in a small SQLite file (credentials stay in the environment), and dump
+# imports are serialized per database with a file lock, so N workers share
+# one warm cache instead of N cold ones.
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+
+from tools.db_tools import (
+    create_temp_mysql_db_from_dump,
+    drop_temp_mysql_db,
+    fetch_mysql_schema,
+    mysql_db_config,
+    mysql_db_exists,
+    mysql_db_name,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+STATE_DIR = os.getenv("STATE_DIR", os.path.join("uploads", ".state"))
+STATE_DB = os.path.join(STATE_DIR, "datasets.sqlite3")
+LOCK_DIR = os.path.join(STATE_DIR, "locks")
+
+
+def _connect():
+    os.makedirs(STATE_DIR, exist_ok=True)
+    conn = sqlite3.connect(STATE_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS datasets (
+            filename   TEXT PRIMARY KEY,
+            database   TEXT NOT NULL,
+            schema     TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+    return conn
+
+
+@contextmanager
+def dataset_lock(db_name: str):
+    """
+    Cross-process exclusive lock for one MySQL database.
+    Held while a dump is imported into it or it is dropped. Keyed by the
+    database name, since several filenames can map to the same database.
+    """
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    lock_path = os.path.join(LOCK_DIR, f"{db_name}.lock")
+    with open(lock_path, "a+") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def get_dataset(filename: str):
+    """
+    Returns {"filename", "schema", "db_config"} for a loaded dataset, or None.
+    db_config is rebuilt from the current MySQL settings on every read.
+    """
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT database, schema FROM datasets WHERE filename = ?", (filename,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    return {
+        "filename": filename,
+        "schema": json.loads(row[1]),
+        "db_config": mysql_db_config(row[0]),
+    }
+
+
+def save_dataset(filename: str, database: str, schema: dict):
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?)",
+                (filename, database, json.dumps(schema), time.time()),
+            )
+    finally:
+        conn.close()
+
+
+def remove_dataset(filename: str):
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM datasets WHERE filename = ?", (filename,))
+    finally:
+        conn.close()
+
+
+def dataset_for_database(db_name: str):
+    """
+    Returns the filename registered for db_name, or None.
+    """
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT filename FROM datasets WHERE database = ?", (db_name,)
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def list_datasets() -> list:
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT filename FROM datasets").fetchall()
+    finally:
+        conn.close()
+    return [r[0] for r in rows]
+
+
+def load_dataset(file_path: str, reload: bool = False) -> dict:
+    """
+    Returns the registry entry for an uploaded .sql file, importing the dump
+    and reading its schema first if no worker has done so yet, or if its
+    database has since been dropped.
+    reload=True re-imports even if an entry exists (e.g. after re-upload).
+    Raises ValueError if another file already owns the same database.
+    """
+    filename = os.path.basename(file_path)
+    db_name = mysql_db_name(filename)
+    if not reload:
+        entry = get_dataset(filename)
+        if entry and mysql_db_exists(entry["db_config"]["database"]):
+            return entry
+
+    with dataset_lock(db_name):
+        owner = dataset_for_database(db_name)
+        if owner and owner != filename:
+            raise ValueError(f"'{filename}' maps to database '{db_name}', already used by '{owner}'.")
+
+        # another worker may have finished the import while we waited
+        entry = get_dataset(filename)
+        if (entry and mysql_db_exists(entry["db_config"]["database"])
+                and (not reload or os.path.getmtime(file_path) <= _updated_at(filename))):
+            return entry
+
+        # a failed import raises here, so nothing broken gets saved
+        remove_dataset(filename)
+        db_config = create_temp_mysql_db_from_dump(file_path)
+        schema_info = fetch_mysql_schema(db_config)
+        save_dataset(filename, db_config["database"], schema_info)
+
+    return {"filename": filename, "schema": schema_info, "db_config": db_config}
+
+
+def unload_dataset(filename: str):
+    """
+    Drops the dataset's MySQL database and removes it from the registry.
+    """
+    with dataset_lock(mysql_db_name(filename)):
+        entry = get_dataset(filename)
+        if entry:
+            drop_temp_mysql_db(entry["db_config"])
+        remove_dataset(filename)
+
+
+def warm_datasets(upload_dir: str):
+    """
+    Loads every .sql file in upload_dir into the registry.
+    Run once before serving (gunicorn master or python app.py);
+    workers only read the registry.
+    """
+    if not os.path.isdir(upload_dir):
+        return
+    for name in sorted(os.listdir(upload_dir)):
+        if not name.endswith(".sql"):
+            continue
+        try:
+            load_dataset(os.path.join(upload_dir, name))
+        except Exception as e:
+            print(f"Warning: could not pre-load {name} - {e}")
+
+
+def _updated_at(filename: str) -> float:
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT updated_at FROM datasets WHERE filename = ?", (filename,)
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else 0.0